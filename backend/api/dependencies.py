@@ -0,0 +1,11 @@
+from fastapi import Request
+from services.carbon_service import EIACarbonService
+from services.model_service import BatchedHFClient
+
+def get_carbon_service(request: Request) -> EIACarbonService:
+    """Carbon service created once at application startup"""
+    return request.app.state.carbon_service
+
+def get_hf_client(request: Request) -> BatchedHFClient:
+    """Batching Hugging Face client created at application startup"""
+    return request.app.state.hf_client
\ No newline at end of file
@@ -1,24 +1,34 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, Depends, Request, Response
+from api.dependencies import get_carbon_service, get_hf_client
+from config import get_settings
 from models.schemas import TaskRequest, TaskResponse
 from services.task_classifier import classify_task
 from services.region_router import select_optimal_region, get_region_carbon_data
-from services.model_service import process_with_model
+from services.model_service import BatchedHFClient, process_with_model
+from services.carbon_service import EIACarbonService
 
 router = APIRouter()
 
 @router.post("/process", response_model=TaskResponse)
-async def process_task(request: TaskRequest):
+async def process_task(
+    request: TaskRequest,
+    carbon_service: EIACarbonService = Depends(get_carbon_service),
+    hf_client: BatchedHFClient = Depends(get_hf_client),
+):
     # 1. Classify the task
     task_type = classify_task(request.text)
     
-    # 2. Select greenest region
-    region = await select_optimal_region()
-    
-    # 3. Process with appropriate model
-    result = await process_with_model(task_type, request.text)
-    
-    # 4. Get carbon impact data
-    carbon_data = await get_region_carbon_data(region)
+    # 2. Run the model while selecting the greenest region and its carbon data;
+    #    neither depends on the other
+    model_task = asyncio.create_task(process_with_model(task_type, request.text, hf_client))
+    try:
+        region = await select_optimal_region(carbon_service)
+        carbon_data = await get_region_carbon_data(region, carbon_service)
+        result = await model_task
+    finally:
+        # Don't leave the model call running if we were cancelled or a lookup raised
+        model_task.cancel()
     
     return TaskResponse(
         result=result,
@@ -34,14 +44,28 @@ async def health_check():
     return {"status": "healthy"}
 
 @router.get("/regions/ranking")
-async def get_regions_ranking():
+async def get_regions_ranking(
+    request: Request,
+    carbon_service: EIACarbonService = Depends(get_carbon_service),
+):
     """Get all regions ranked by carbon intensity"""
-    try:
-        from services.carbon_service import EIACarbonService
-        from config import settings
-        
-        carbon_service = EIACarbonService(settings.eia_api_key)
-        rankings = await carbon_service.get_carbon_rankings()
-        return {"rankings": rankings}
-    except Exception as e:
-        return {"error": str(e), "rankings": []}
\ No newline at end of file
+    body, etag = carbon_service.get_rankings_payload()
+    if etag is None:
+        # No fresh data (cold start or snapshot expired in an outage); make sure nobody caches the empty list
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+    
+    # Rankings only change when the snapshot refreshes, so let clients revalidate cheaply
+    max_age = get_settings().carbon_refresh_minutes * 60
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate=600",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison per RFC 9110: W/ prefixes are ignored on both sides"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
\ No newline at end of file
@@ -1,45 +1,49 @@
-import os
-from pydantic import Field
-from pydantic_settings import BaseSettings
-from typing import List, Optional
+from functools import lru_cache
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List, Optional, Union
 
 class Settings(BaseSettings):
     # EIA API Configuration
-    eia_api_key: str = Field(..., env="EIA_API_KEY", description="EIA API key for carbon intensity data")
+    eia_api_key: str = Field(..., description="EIA API key for carbon intensity data")
     
     # Hugging Face Configuration (optional)
-    huggingface_token: Optional[str] = Field(None, env="HUGGINGFACE_TOKEN", description="Hugging Face API token")
+    huggingface_token: Optional[str] = Field(None, description="Hugging Face API token")
     
     # Application Configuration
-    debug: bool = Field(False, env="DEBUG")
-    log_level: str = Field("INFO", env="LOG_LEVEL")
+    debug: bool = False
+    log_level: str = "INFO"
     
-    # CORS Configuration
-    cors_origins: List[str] = Field(
-        default=["http://localhost:3000", "http://127.0.0.1:3000"],
-        env="CORS_ORIGINS"
+    # CORS Configuration (JSON list or comma-separated string)
+    cors_origins: Union[List[str], str] = Field(
+        default=["http://localhost:3000", "http://127.0.0.1:3000"]
     )
     
     # API Configuration
-    api_version: str = Field("v1", env="API_VERSION")
-    max_request_size: str = Field("10MB", env="MAX_REQUEST_SIZE")
+    api_version: str = "v1"
+    max_request_size: str = "10MB"
     
     # Cache Configuration
-    cache_ttl_minutes: int = Field(30, env="CACHE_TTL_MINUTES")
+    cache_ttl_minutes: int = 30
+    carbon_refresh_minutes: int = 5
+    redis_url: Optional[str] = Field(None, description="Shared cache, e.g. redis://localhost:6379/0")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        frozen=True,
+    )
+
+    @field_validator("cors_origins", mode="before")
+    @classmethod
+    def split_cors_origins(cls, value):
+        """Accept CORS_ORIGINS as a comma-separated list as well as JSON"""
+        if isinstance(value, str):
+            return [origin.strip() for origin in value.split(",") if origin.strip()]
+        return value
 
-# Create global settings instance
-try:
-    settings = Settings()
-except Exception as e:
-    print(f"Error loading settings: {e}")
-    # Create settings with environment variables directly as fallback
-    settings = Settings(
-        eia_api_key=os.getenv("EIA_API_KEY", ""),
-        debug=os.getenv("DEBUG", "false").lower() == "true",
-        cors_origins=["http://localhost:3000"]
-    )
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """Load settings from the environment once per process"""
+    return Settings()
\ No newline at end of file
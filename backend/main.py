@@ -1,13 +1,20 @@
+import asyncio
+import httpx
+from aiocache import Cache
+from aiocache.serializers import PickleSerializer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from api.routes import router
-from config import settings
+from config import get_settings
+from services.carbon_service import EIACarbonService
+from services.model_service import BatchedHFClient
 
-app = FastAPI(title="Green AI Router", version="0.1.0")
+app = FastAPI(title="Green AI Router", version="0.1.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -15,6 +22,47 @@ app.add_middleware(
 
 app.include_router(router, prefix="/api")
 
+@app.on_event("startup")
+async def startup():
+    settings = get_settings()
+    # One pooled HTTP/2 client per worker; concurrent requests multiplex over a
+    # kept-alive connection instead of paying a TCP/TLS handshake each
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=3.0),
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300),
+        headers={"User-Agent": "green-moe/0.1"},
+    )
+    # Redis lets every worker reuse the same EIA readings
+    app.state.shared_cache = None
+    if settings.redis_url:
+        app.state.shared_cache = Cache.from_url(settings.redis_url)
+        app.state.shared_cache.serializer = PickleSerializer()
+    # Single carbon service per worker so its reading cache is shared across requests
+    app.state.carbon_service = EIACarbonService(
+        settings.eia_api_key,
+        client=app.state.http_client,
+        shared_cache=app.state.shared_cache,
+    )
+    # Groups concurrent prompts per model into batched Inference API calls
+    app.state.hf_client = BatchedHFClient(app.state.http_client, settings.huggingface_token)
+    # Pre-warm the cache and keep the greenest-region snapshot current
+    app.state.carbon_refresh_task = asyncio.create_task(
+        app.state.carbon_service.run_refresh_loop(settings.carbon_refresh_minutes * 60)
+    )
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.carbon_refresh_task.cancel()
+    try:
+        await app.state.carbon_refresh_task
+    except asyncio.CancelledError:
+        pass
+    await app.state.hf_client.close()
+    if app.state.shared_cache is not None:
+        await app.state.shared_cache.close()
+    await app.state.http_client.aclose()
+
 @app.get("/")
 async def root():
     return {"message": "Green AI Router API"}
\ No newline at end of file
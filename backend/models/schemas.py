@@ -1,9 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class TaskRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     text: str
 
 class TaskResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     result: str
     task_type: str
     region: str
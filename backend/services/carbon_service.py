@@ -1,37 +1,79 @@
 import asyncio
+import hashlib
 import httpx
+import msgspec
+import orjson
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
+from aiocache.base import BaseCache
 import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+class EIARecord(msgspec.Struct):
+    """One hourly generation row from the EIA fuel-type-data endpoint"""
+    period: str = ""
+    respondent: str = "unknown"
+    fueltype: str = "unknown"
+    value: Union[float, str, None] = None  # MWh; missing hours come back as null
+
+class EIAResponseBody(msgspec.Struct):
+    data: List[EIARecord] = []
+
+class EIAResponse(msgspec.Struct):
+    response: EIAResponseBody = msgspec.field(default_factory=EIAResponseBody)
+
+# Decodes EIA payloads straight into typed structs, skipping intermediate dicts
+_eia_decoder = msgspec.json.Decoder(EIAResponse)
+
+@dataclass(slots=True, frozen=True)
 class FuelGeneration:
     fuel_type: str
     generation_mwh: float
     percentage: float
+    fuel_id: int  # Index into EIACarbonService.emission_factor_table
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CarbonReading:
     gcp_region: str
     balancing_authority: str
     carbon_intensity: float  # gCO2/kWh
     renewable_percent: float
-    fuel_mix: List[FuelGeneration]
+    fuel_mix: Tuple[FuelGeneration, ...]
     timestamp: datetime
     data_hour: str  # Hour the grid data represents
 
 class EIACarbonService:
-    def __init__(self, eia_api_key: str = None):
+    def __init__(
+        self,
+        eia_api_key: str = None,
+        client: Optional[httpx.AsyncClient] = None,
+        shared_cache: Optional[BaseCache] = None,
+    ):
         self.eia_api_key = eia_api_key or os.getenv('EIA_API_KEY')
         if not self.eia_api_key:
             raise ValueError("EIA API key required. Get free key at https://www.eia.gov/opendata/")
         
-        self.cache = {}
-        self.cache_duration = timedelta(minutes=30)  # EIA updates hourly, cache for 30min
+        # Shared HTTP client so repeated EIA fetches reuse pooled connections
+        self.client = client or httpx.AsyncClient(timeout=15)
+        
+        self.cache = {}  # cache_key -> (reading, time.monotonic() when the reading was built)
+        # Optional cross-worker store (e.g. Redis) consulted after the in-process cache
+        self.shared_cache = shared_cache
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache_key -> pending fetch
+        
+        # Latest ranking, kept current by run_refresh_loop so lookups never wait on EIA
+        self._greenest_region: Optional[str] = None
+        self._rankings_snapshot: List[Dict] = []
+        # Serialized {"rankings": ...} body and its ETag, built once per refresh
+        self._rankings_body: bytes = b""
+        self._rankings_etag: Optional[str] = None
+        # Newest reading timestamp in the snapshot; past cache_duration the snapshot counts as empty
+        self._snapshot_built_at: Optional[datetime] = None
+        self.cache_duration = 30 * 60  # seconds; EIA updates hourly, cache for 30min
         
         # EPA emission factors (lbs CO2/MWh) - Updated to match EIA API fuel codes
         # Source: EPA eGRID 2021 data
@@ -64,6 +106,26 @@ class EIACarbonService:
             "other": 500,     # fallback
         }
         
+        # Intern fuel codes to small ints at parse time so the per-fuel math is a
+        # tuple index instead of a string hash. Unknown fuels share the last id.
+        self.fuel_ids = {fuel: idx for idx, fuel in enumerate(self.emission_factors)}
+        self.unknown_fuel_id = len(self.fuel_ids)
+        self.emission_factor_table = tuple(self.emission_factors.values()) + (500,)
+        
+        # EIA fuel codes counted as renewable generation
+        self.renewable_fuels = frozenset({
+            "wnd",    # wind
+            "sun",    # solar
+            "wat",    # conventional hydroelectric
+            "ps",     # pumped storage hydro
+            "geo",    # geothermal
+            "bio",    # biomass (technically renewable)
+            # Alternative spellings that might appear
+            "wind", "solar", "hydro", "geothermal", "biomass"
+        })
+        # Bit i set when fuel id i is renewable, so the hot loop tests a bit instead of hashing
+        self.renewable_mask = sum(1 << self.fuel_ids[fuel] for fuel in self.renewable_fuels)
+        
         # Map GCP regions to EIA balancing authorities
         # Based on actual datacenter locations
         self.gcp_to_eia_mapping = {
@@ -110,128 +172,328 @@ class EIACarbonService:
             }
         }
 
-    async def get_all_regions_carbon_intensity(self) -> List[CarbonReading]:
+    async def get_all_regions_carbon_intensity(self, force_refresh: bool = False) -> List[CarbonReading]:
         """Get carbon intensity for all GCP regions using EIA data"""
-        tasks = []
-        
-        for gcp_region in self.gcp_to_eia_mapping.keys():
-            tasks.append(self._get_region_carbon_reading(gcp_region))
-            
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await self._get_region_carbon_readings(
+            list(self.gcp_to_eia_mapping.keys()), force_refresh=force_refresh
+        )
         
         # Filter successful results
-        readings = []
-        for result in results:
-            if isinstance(result, CarbonReading):
-                readings.append(result)
-            elif isinstance(result, Exception):
-                logger.warning(f"Failed to get carbon data for region: {result}")
+        readings = [reading for reading in results.values() if reading]
                 
         # Sort by carbon intensity (greenest first)
         return sorted(readings, key=lambda x: x.carbon_intensity)
 
-    async def _get_region_carbon_reading(self, gcp_region: str) -> Optional[CarbonReading]:
+    async def _get_region_carbon_reading(
+        self, gcp_region: str, force_refresh: bool = False
+    ) -> Optional[CarbonReading]:
         """Get carbon intensity for a specific GCP region"""
+        results = await self._get_region_carbon_readings([gcp_region], force_refresh=force_refresh)
+        return results.get(gcp_region)
+
+    async def _get_region_carbon_readings(
+        self, gcp_regions: List[str], force_refresh: bool = False
+    ) -> Dict[str, Optional[CarbonReading]]:
+        """Get carbon readings for several GCP regions, fetching cache misses in one EIA call"""
+        results = {}
+        pending = {}  # regions another caller is already fetching
+        to_fetch = []
+        
+        # Check cache first: local entries, then one shared-cache round trip for the rest
+        if not force_refresh:
+            for gcp_region in gcp_regions:
+                cached_reading = self._get_local_reading(f"carbon_{gcp_region}")
+                if cached_reading:
+                    results[gcp_region] = cached_reading
+            misses = [gcp_region for gcp_region in gcp_regions if gcp_region not in results]
+            shared_readings = await self._get_shared_readings([f"carbon_{gcp_region}" for gcp_region in misses])
+            for gcp_region in misses:
+                shared_reading = shared_readings.get(f"carbon_{gcp_region}")
+                if shared_reading:
+                    results[gcp_region] = shared_reading
+        
+        for gcp_region in gcp_regions:
+            if gcp_region in results:
+                continue
+            cache_key = f"carbon_{gcp_region}"
+            
+            # A fetch may have landed while we awaited the shared cache
+            if not force_refresh:
+                cached_reading = self._get_local_reading(cache_key)
+                if cached_reading:
+                    results[gcp_region] = cached_reading
+                    continue
+            
+            # Coalesce concurrent cache misses onto a single outbound fetch
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                pending[gcp_region] = inflight
+            else:
+                to_fetch.append(gcp_region)
+        
+        if to_fetch:
+            loop = asyncio.get_running_loop()
+            futures = {gcp_region: loop.create_future() for gcp_region in to_fetch}
+            for gcp_region, future in futures.items():
+                self._inflight[f"carbon_{gcp_region}"] = future
+            try:
+                fetched = await self._fetch_region_carbon_readings(to_fetch)
+            except asyncio.CancelledError:
+                for future in futures.values():
+                    future.cancel()
+                raise
+            except Exception as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    # Waiters re-raise it; retrieve it here so an unawaited future doesn't warn
+                    future.exception()
+                raise
+            else:
+                # Cache locally before leaving the in-flight map so no caller can miss both
+                fresh = {
+                    f"carbon_{gcp_region}": reading for gcp_region, reading in fetched.items() if reading
+                }
+                for cache_key, reading in fresh.items():
+                    self._cache_locally(cache_key, reading)
+                for gcp_region, future in futures.items():
+                    future.set_result(fetched.get(gcp_region))
+            finally:
+                for gcp_region in to_fetch:
+                    self._inflight.pop(f"carbon_{gcp_region}", None)
+            
+            await self._set_shared_readings(fresh)
+            results.update(fetched)
         
-        # Check cache first
-        cache_key = f"carbon_{gcp_region}"
+        for gcp_region, future in pending.items():
+            results[gcp_region] = await future
+            
+        return results
+
+    def _get_local_reading(self, cache_key: str) -> Optional[CarbonReading]:
+        """Look up a fresh reading in the in-process cache"""
         if cache_key in self.cache:
             cached_reading, cached_time = self.cache[cache_key]
-            if datetime.now() - cached_time < self.cache_duration:
+            if time.monotonic() - cached_time < self.cache_duration:
                 return cached_reading
+        return None
+
+    def _cache_locally(self, cache_key: str, reading: CarbonReading) -> None:
+        """Store a reading in the local cache, aged by when it was built rather than when it arrived"""
+        self.cache[cache_key] = (reading, time.monotonic() - self._reading_age(reading))
+
+    @staticmethod
+    def _reading_age(reading: CarbonReading) -> float:
+        """Seconds since a reading was built; wall clock, since readings may come from another worker"""
+        return max(0.0, (datetime.now() - reading.timestamp).total_seconds())
+
+    async def _get_shared_readings(self, cache_keys: List[str]) -> Dict[str, CarbonReading]:
+        """Fetch fresh readings from the shared cache in one round trip and cache them locally"""
+        if self.shared_cache is None or not cache_keys:
+            return {}
+        try:
+            values = await self.shared_cache.multi_get(cache_keys)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return {}
         
-        region_config = self.gcp_to_eia_mapping.get(gcp_region)
-        if not region_config:
-            logger.warning(f"No EIA mapping for GCP region: {gcp_region}")
-            return None
-            
-        # Get fuel mix from EIA API
-        fuel_mix = await self._fetch_eia_fuel_mix(region_config["balancing_authority"])
+        readings = {}
+        for cache_key, reading in zip(cache_keys, values):
+            if reading and self._reading_age(reading) < self.cache_duration:
+                self._cache_locally(cache_key, reading)
+                readings[cache_key] = reading
+        return readings
+
+    async def _set_shared_readings(self, readings: Dict[str, CarbonReading]) -> None:
+        """Store readings in the shared cache with the same TTL as the local cache"""
+        if self.shared_cache is None or not readings:
+            return
+        try:
+            await self.shared_cache.multi_set(list(readings.items()), ttl=self.cache_duration)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    async def _load_shared_readings(self) -> List[CarbonReading]:
+        """Get every region's reading published to the shared cache, without fetching from EIA"""
+        shared_readings = await self._get_shared_readings(
+            [f"carbon_{gcp_region}" for gcp_region in self.gcp_to_eia_mapping.keys()]
+        )
         
-        if not fuel_mix:
-            logger.warning(f"No fuel mix data for {gcp_region}")
-            return None
+        # Sort by carbon intensity (greenest first)
+        return sorted(shared_readings.values(), key=lambda x: x.carbon_intensity)
+
+    async def _acquire_refresh_lease(self, lease_seconds: float) -> bool:
+        """Claim this refresh interval across workers (SET NX); True means this worker should fetch"""
+        if self.shared_cache is None:
+            return True
+        try:
+            await self.shared_cache.add("carbon_refresh_lease", os.getpid(), ttl=max(1, int(lease_seconds)))
+            return True
+        except ValueError:
+            # Another worker already holds the lease for this interval
+            return False
+        except Exception as e:
+            logger.warning(f"Shared cache lease failed, refreshing locally: {e}")
+            return True
+
+    async def refresh_snapshot(self, force_refresh: bool = False, shared_only: bool = False) -> List[CarbonReading]:
+        """Recompute the greenest region and rankings snapshot from current readings"""
+        if shared_only:
+            readings = await self._load_shared_readings()
+        else:
+            readings = await self.get_all_regions_carbon_intensity(force_refresh=force_refresh)
+        
+        # Keep serving the previous snapshot if every region failed
+        if readings:
+            self._rankings_snapshot = self._build_rankings(readings)
+            self._rankings_body = orjson.dumps({"rankings": self._rankings_snapshot})
+            self._rankings_etag = f'"{hashlib.sha1(self._rankings_body).hexdigest()}"'
+            self._greenest_region = readings[0].gcp_region
+            self._snapshot_built_at = max(reading.timestamp for reading in readings)
+        logger.info(f"Refreshed carbon data for {len(readings)} regions")
+        return readings
+
+    async def run_refresh_loop(self, interval_seconds: float, follower_retry_seconds: float = 5) -> None:
+        """Keep the cache and snapshot warm by refetching every region on a fixed interval"""
+        while True:
+            delay = interval_seconds
+            try:
+                # Only one worker per interval fetches from EIA; the rest read what it published.
+                # The lease expires just before the next interval so the next round is contested again.
+                if await self._acquire_refresh_lease(interval_seconds * 0.9):
+                    await self.refresh_snapshot(force_refresh=True)
+                else:
+                    readings = await self.refresh_snapshot(shared_only=True)
+                    # Check back soon if the lease holder hasn't published this interval's data yet
+                    if not readings or min(map(self._reading_age, readings)) >= interval_seconds:
+                        delay = min(interval_seconds, follower_retry_seconds)
+            except Exception as e:
+                logger.error(f"Carbon data refresh failed: {e}")
+            await asyncio.sleep(delay)
+
+    async def _fetch_region_carbon_readings(self, gcp_regions: List[str]) -> Dict[str, Optional[CarbonReading]]:
+        """Build fresh carbon readings for GCP regions from a single bulk EIA fetch"""
+        readings = {}
+        authorities = []
+        for gcp_region in gcp_regions:
+            region_config = self.gcp_to_eia_mapping.get(gcp_region)
+            if not region_config:
+                logger.warning(f"No EIA mapping for GCP region: {gcp_region}")
+                readings[gcp_region] = None
+            elif region_config["balancing_authority"] not in authorities:
+                authorities.append(region_config["balancing_authority"])
+        
+        if not authorities:
+            return readings
             
-        # Calculate carbon intensity and renewable percentage
-        carbon_intensity = self._calculate_carbon_intensity(fuel_mix)
-        renewable_percent = self._calculate_renewable_percentage(fuel_mix)
+        # Get fuel mix for every balancing authority from EIA API
+        fuel_mixes = await self._fetch_eia_fuel_mix_bulk(authorities) or {}
         
         # Get the most recent data hour
-        data_hour = datetime.now().strftime("%Y-%m-%d %H:00")
+        timestamp = datetime.now()
+        data_hour = timestamp.strftime("%Y-%m-%d %H:00")
         
-        reading = CarbonReading(
-            gcp_region=gcp_region,
-            balancing_authority=region_config["balancing_authority"],
-            carbon_intensity=carbon_intensity,
-            renewable_percent=renewable_percent,
-            fuel_mix=fuel_mix,
-            timestamp=datetime.now(),
-            data_hour=data_hour
-        )
+        for gcp_region in gcp_regions:
+            if gcp_region in readings:
+                continue
+            balancing_authority = self.gcp_to_eia_mapping[gcp_region]["balancing_authority"]
+            fuel_mix = fuel_mixes.get(balancing_authority)
+            
+            if not fuel_mix:
+                logger.warning(f"No fuel mix data for {gcp_region}")
+                readings[gcp_region] = None
+                continue
+                
+            # Calculate carbon intensity and renewable percentage
+            carbon_intensity, renewable_percent = self._summarize_fuel_mix(fuel_mix)
+            
+            readings[gcp_region] = CarbonReading(
+                gcp_region=gcp_region,
+                balancing_authority=balancing_authority,
+                carbon_intensity=carbon_intensity,
+                renewable_percent=renewable_percent,
+                fuel_mix=fuel_mix,
+                timestamp=timestamp,
+                data_hour=data_hour
+            )
         
-        # Cache the result
-        self.cache[cache_key] = (reading, datetime.now())
-        return reading
+        return readings
 
-    async def _fetch_eia_fuel_mix(self, balancing_authority: str) -> Optional[List[FuelGeneration]]:
-        """Fetch hourly fuel mix from EIA API for a balancing authority"""
+    async def _fetch_eia_fuel_mix_bulk(self, authorities: List[str]) -> Optional[Dict[str, Tuple[FuelGeneration, ...]]]:
+        """Fetch hourly fuel mix from EIA API for several balancing authorities in one request"""
         try:
-            async with httpx.AsyncClient() as client:
-                # EIA API v2 endpoint for electricity generation by fuel type
-                url = "https://api.eia.gov/v2/electricity/rto/fuel-type-data/data/"
-                
-                # Get the last 24 hours of data to find most recent
-                params = {
-                    "api_key": self.eia_api_key,
-                    "frequency": "hourly",
-                    "data[0]": "value",  # Generation value in MWh
-                    "facets[respondent][]": balancing_authority,
-                    "sort[0][column]": "period",
-                    "sort[0][direction]": "desc",
-                    "length": 100  # Get recent data across all fuel types
-                }
-                
-                response = await client.get(url, params=params, timeout=15)
-                
-                if response.status_code != 200:
-                    logger.error(f"EIA API error {response.status_code} for {balancing_authority}")
-                    return None
-                    
-                data = response.json()
-                
-                # Parse EIA response into fuel mix
-                return self._parse_eia_response(data)
+            # EIA API v2 endpoint for electricity generation by fuel type
+            url = "https://api.eia.gov/v2/electricity/rto/fuel-type-data/data/"
+            
+            # Get recent hours for every authority to find the most recent
+            params = [
+                ("api_key", self.eia_api_key),
+                ("frequency", "hourly"),
+                ("data[0]", "value"),  # Generation value in MWh
+                *(("facets[respondent][]", authority) for authority in authorities),
+                ("sort[0][column]", "period"),
+                ("sort[0][direction]", "desc"),
+                ("length", 2000),  # Recent data across all authorities and fuel types
+            ]
+            
+            response = await self.client.get(url, params=params)
+            
+            if response.status_code != 200:
+                logger.error(f"EIA API error {response.status_code} for {', '.join(authorities)}")
+                return None
                 
+            data = _eia_decoder.decode(response.content)
+            
+            # Parse EIA response into a fuel mix per authority
+            return self._parse_eia_response(data)
+            
         except Exception as e:
-            logger.error(f"EIA API request failed for {balancing_authority}: {e}")
+            logger.error(f"EIA API request failed for {', '.join(authorities)}: {e}")
             return None
 
-    def _parse_eia_response(self, eia_data: dict) -> List[FuelGeneration]:
-        """Parse EIA API response into fuel generation data"""
-        if not eia_data.get("response", {}).get("data"):
-            return []
+    def _parse_eia_response(self, eia_data: EIAResponse) -> Dict[str, Tuple[FuelGeneration, ...]]:
+        """Parse EIA API response into fuel generation data per balancing authority"""
+        if not eia_data.response.data:
+            return {}
             
-        # Group by fuel type and get most recent hour for each fuel
-        fuel_data = {}
+        # Group by authority and fuel type, keeping the most recent hour for each fuel
+        authority_data = {}
         
-        for record in eia_data["response"]["data"]:
-            fuel_type = record.get("fueltype", "unknown").lower().replace("-", "_")
-            generation_mwh = record.get("value", 0) or 0  # Handle None values
-            period = record.get("period", "")
+        for record in eia_data.response.data:
+            respondent = record.respondent
+            fuel_type = record.fueltype.lower().replace("-", "_")
+            period = record.period
+            try:
+                generation_mwh = float(record.value or 0)  # Handle None values
+            except ValueError:
+                # One malformed row shouldn't drop every authority in the bulk response
+                logger.warning(f"Skipping non-numeric EIA value {record.value!r} for {respondent} {fuel_type}")
+                continue
             
             # Keep most recent data for each fuel type
+            fuel_data = authority_data.setdefault(respondent, {})
             if fuel_type not in fuel_data or period > fuel_data[fuel_type]["period"]:
                 fuel_data[fuel_type] = {
-                    "generation": float(generation_mwh),
+                    "generation": generation_mwh,
                     "period": period
                 }
         
+        fuel_mixes = {}
+        for respondent, fuel_data in authority_data.items():
+            fuel_mix = self._build_fuel_mix(fuel_data)
+            if fuel_mix:
+                fuel_mixes[respondent] = fuel_mix
+            else:
+                logger.warning(f"Zero total generation found in EIA data for {respondent}")
+                
+        return fuel_mixes
+
+    def _build_fuel_mix(self, fuel_data: Dict[str, dict]) -> Tuple[FuelGeneration, ...]:
+        """Turn the latest generation per fuel type into a sorted fuel mix"""
         # Calculate total generation and percentages
         total_generation = sum(data["generation"] for data in fuel_data.values())
         
         if total_generation == 0:
-            logger.warning("Zero total generation found in EIA data")
-            return []
+            return ()
         
         # Create fuel generation objects
         fuel_mix = []
@@ -242,72 +504,59 @@ class EIACarbonService:
             fuel_mix.append(FuelGeneration(
                 fuel_type=fuel_type,
                 generation_mwh=generation,
-                percentage=percentage
+                percentage=percentage,
+                fuel_id=self.fuel_ids.get(fuel_type, self.unknown_fuel_id)
             ))
         
         # Sort by generation amount (largest first)
-        return sorted(fuel_mix, key=lambda x: x.generation_mwh, reverse=True)
+        return tuple(sorted(fuel_mix, key=lambda x: x.generation_mwh, reverse=True))
 
-    def _calculate_carbon_intensity(self, fuel_mix: List[FuelGeneration]) -> float:
-        """Calculate carbon intensity from fuel mix using EPA emission factors"""
-        total_generation = sum(fuel.generation_mwh for fuel in fuel_mix)
-        
-        if total_generation == 0:
-            return 500.0  # Default moderate value
-            
-        weighted_emissions = 0.0
+    def _summarize_fuel_mix(self, fuel_mix: Tuple[FuelGeneration, ...]) -> Tuple[float, float]:
+        """Calculate carbon intensity and renewable percentage in a single pass over the fuel mix"""
+        emission_factors = self.emission_factor_table
+        renewable_mask = self.renewable_mask
+        total_generation = renewable_generation = weighted_emissions = 0.0
         
         for fuel in fuel_mix:
-            # Use the fuel type directly (already cleaned in parsing)
-            fuel_key = fuel.fuel_type.lower()
-            
-            # Get emission factor - now matches EIA codes
-            emission_factor = self.emission_factors.get(fuel_key, 500)
-            
-            # Weight by generation share
-            weight = fuel.generation_mwh / total_generation
-            weighted_emissions += emission_factor * weight
+            generation = fuel.generation_mwh
+            total_generation += generation
+            # Weight emission factor (looked up by interned fuel id) by generation
+            weighted_emissions += emission_factors[fuel.fuel_id] * generation
+            renewable_generation += generation * (renewable_mask >> fuel.fuel_id & 1)
+        
+        if total_generation == 0:
+            return 500.0, 0.0  # Default moderate value
         
         # Convert from lbs CO2/MWh to gCO2/kWh
         # 1 lb = 453.592 grams, 1 MWh = 1000 kWh
-        carbon_intensity_g_per_kwh = (weighted_emissions * 453.592) / 1000
+        carbon_intensity_g_per_kwh = (weighted_emissions / total_generation) * 453.592 / 1000
+        renewable_percent = (renewable_generation / total_generation) * 100
         
-        return round(carbon_intensity_g_per_kwh, 1)
+        return round(carbon_intensity_g_per_kwh, 1), round(renewable_percent, 1)
 
-    def _calculate_renewable_percentage(self, fuel_mix: List[FuelGeneration]) -> float:
-        """Calculate percentage of renewable generation - Updated for EIA codes"""
-        # Updated to use EIA fuel codes
-        renewable_fuels = {
-            "wnd",    # wind
-            "sun",    # solar  
-            "wat",    # conventional hydroelectric
-            "ps",     # pumped storage hydro
-            "geo",    # geothermal
-            "bio",    # biomass (technically renewable)
-            # Alternative spellings that might appear
-            "wind", "solar", "hydro", "geothermal", "biomass"
-        }
-        
-        total_generation = sum(fuel.generation_mwh for fuel in fuel_mix)
-        renewable_generation = sum(
-            fuel.generation_mwh for fuel in fuel_mix 
-            if fuel.fuel_type.lower() in renewable_fuels
-        )
-        
-        if total_generation == 0:
-            return 0.0
-            
-        return round((renewable_generation / total_generation) * 100, 1)
+    def _snapshot_is_fresh(self) -> bool:
+        """Whether the snapshot holds data younger than cache_duration (False on cold start or a long outage)"""
+        if self._snapshot_built_at is None:
+            return False
+        return (datetime.now() - self._snapshot_built_at).total_seconds() < self.cache_duration
 
     async def get_greenest_region(self) -> Optional[str]:
-        """Get the GCP region with the lowest carbon intensity"""
-        readings = await self.get_all_regions_carbon_intensity()
-        return readings[0].gcp_region if readings else None
+        """Get the GCP region with the lowest carbon intensity (None without a fresh snapshot)"""
+        return self._greenest_region if self._snapshot_is_fresh() else None
 
     async def get_carbon_rankings(self) -> List[Dict]:
-        """Get all regions ranked by carbon intensity (greenest first)"""
-        readings = await self.get_all_regions_carbon_intensity()
-        
+        """Get all regions ranked by carbon intensity (greenest first), empty without a fresh snapshot"""
+        return self._rankings_snapshot if self._snapshot_is_fresh() else []
+
+    def get_rankings_payload(self) -> Tuple[bytes, Optional[str]]:
+        """Get the serialized rankings response body and its ETag (None without a fresh snapshot)"""
+        # One age check covers both, so a stale body never goes out with a cacheable ETag
+        if not self._snapshot_is_fresh():
+            return orjson.dumps({"rankings": []}), None
+        return self._rankings_body, self._rankings_etag
+
+    def _build_rankings(self, readings: List[CarbonReading]) -> List[Dict]:
+        """Format readings sorted greenest first as ranking entries"""
         rankings = []
         for idx, reading in enumerate(readings):
             rankings.append({
@@ -329,6 +578,20 @@ class EIACarbonService:
             
         return rankings
 
+    def get_cached_region_carbon_intensity(self, gcp_region: str) -> Optional[Dict]:
+        """Get a region's carbon summary from the local cache only, never fetching from EIA"""
+        reading = self._get_local_reading(f"carbon_{gcp_region}")
+        
+        if not reading:
+            return None
+            
+        return {
+            "carbon_intensity": reading.carbon_intensity,
+            "renewable_percent": reading.renewable_percent,
+            "balancing_authority": reading.balancing_authority,
+            "data_hour": reading.data_hour
+        }
+
     async def get_region_carbon_intensity(self, gcp_region: str) -> Optional[Dict]:
         """Get carbon intensity for a specific GCP region"""
         reading = await self._get_region_carbon_reading(gcp_region)
@@ -374,6 +637,7 @@ async def test_carbon_service():
     
     # Test all regions ranking
     print("\n2. All regions ranking (greenest first):")
+    await service.refresh_snapshot()
     rankings = await service.get_carbon_rankings()
     
     for rank in rankings:
@@ -1,16 +1,177 @@
+import asyncio
 import httpx
-from config import settings
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from async_lru import alru_cache
 
-async def process_with_model(task_type: str, text: str) -> str:
+logger = logging.getLogger(__name__)
+
+class BatchedHFClient:
+    """Micro-batches concurrent prompts for the same model into one Inference API call"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token: Optional[str] = None,
+        max_batch: int = 16,
+        max_wait: float = 0.01,
+    ):
+        self.client = client
+        self.token = token
+        self.max_batch = max_batch
+        self.max_wait = max_wait  # seconds to wait for more prompts after the first
+        
+        self._queues: Dict[str, asyncio.Queue] = {}  # model_name -> pending (text, future)
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._sends: Set[asyncio.Task] = set()
+
+    async def submit(self, model_name: str, text: str) -> Optional[str]:
+        """Queue a prompt and wait for its generated text (None if nothing came back)"""
+        queue = self._queues.get(model_name)
+        if queue is None:
+            queue = self._queues[model_name] = asyncio.Queue()
+            self._workers[model_name] = asyncio.create_task(self._run_batches(model_name, queue))
+        
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop batch workers and any requests still in flight, failing prompts that never got sent"""
+        tasks = [*self._workers.values(), *self._sends]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                self._fail(future)
+        self._queues.clear()
+        self._workers.clear()
+
+    @staticmethod
+    def _fail(future: asyncio.Future) -> None:
+        """Resolve a waiting prompt with a shutdown error so its caller doesn't hang"""
+        if not future.done():
+            future.set_exception(RuntimeError("Hugging Face client closed"))
+            # The caller may already be gone; retrieve it so an unawaited future doesn't warn
+            future.exception()
+
+    async def _run_batches(self, model_name: str, queue: asyncio.Queue) -> None:
+        """Collect up to max_batch prompts within max_wait and send them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closed while collecting; these prompts were already taken off the queue
+                for _, future in batch:
+                    self._fail(future)
+                raise
+            
+            # Send in the background so the next batch fills while this one runs
+            send = asyncio.create_task(self._send_batch(model_name, batch))
+            self._sends.add(send)
+            send.add_done_callback(self._sends.discard)
+
+    async def _send_batch(self, model_name: str, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Call the Inference API once for a batch and resolve each prompt's future"""
+        texts = [text for text, _ in batch]
+        try:
+            # A lone prompt goes out as before; batches use the list form of inputs
+            outputs = await self._post(model_name, texts[0] if len(texts) == 1 else texts, len(texts))
+            if outputs is None and len(texts) > 1:
+                # One bad prompt (too long, say) rejects the whole batch; retry each alone
+                # so only that prompt fails
+                outputs = await asyncio.gather(
+                    *(self._post(model_name, text, 1) for text in texts),
+                    return_exceptions=True
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                self._fail(future)
+            raise
+        except Exception as e:
+            logger.error(f"Hugging Face request failed for {model_name}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        if outputs is None:
+            outputs = [None] * len(batch)
+        for (_, future), output in zip(batch, outputs):
+            if future.done():
+                continue
+            if isinstance(output, BaseException):
+                logger.error(f"Hugging Face request failed for {model_name}: {output}")
+                future.set_exception(output)
+            elif isinstance(output, list):
+                # Per-prompt retry: a one-element list, or None if that prompt failed too
+                future.set_result(output[0])
+            else:
+                future.set_result(output)
+
+    async def _post(self, model_name: str, inputs, count: int) -> Optional[List[Optional[str]]]:
+        """Send one Inference API request; None if it was rejected or malformed"""
+        response = await self.client.post(
+            f"https://api-inference.huggingface.co/models/{model_name}",
+            headers={"Authorization": f"Bearer {self.token}"},
+            json={"inputs": inputs}
+        )
+        if response.status_code != 200:
+            logger.warning(f"Hugging Face returned {response.status_code} for {model_name}: {response.text}")
+            return None
+        try:
+            result = response.json()
+        except ValueError:
+            logger.warning(f"Non-JSON Hugging Face response for {model_name}: {response.text}")
+            return None
+        return self._parse_outputs(result, count)
+
+    @staticmethod
+    def _parse_outputs(result, count: int) -> Optional[List[Optional[str]]]:
+        """Extract one generated text per prompt from an Inference API response"""
+        if not isinstance(result, list) or not result:
+            logger.warning(f"Unexpected Hugging Face response: {result}")
+            return None
+        if count == 1:
+            result = result[:1]
+        
+        outputs = []
+        for item in result:
+            # Batched responses may nest each prompt's generations in a list
+            if isinstance(item, list):
+                item = item[0] if item else {}
+            outputs.append(item.get("generated_text") if isinstance(item, dict) else None)
+        
+        if len(outputs) != count:
+            logger.warning(f"Expected {count} generations from Hugging Face, got {len(outputs)}")
+            return None
+        return outputs
+
+async def process_with_model(task_type: str, text: str, hf_client: BatchedHFClient) -> str:
     """Route to appropriate AI model based on task type"""
     
     if task_type == "grammar":
         return await call_huggingface_model(
+            hf_client,
             "pszemraj/flan-t5-large-grammar-synthesis", 
             text
         )
     elif task_type == "email":
         return await call_huggingface_model(
+            hf_client,
             "google/flan-t5-base", 
             f"Write a professional email: {text}"
         )
@@ -18,13 +179,18 @@ async def process_with_model(task_type: str, text: str) -> str:
         # Placeholder for search functionality
         return f"Search results for: {text}"
     
-async def call_huggingface_model(model_name: str, text: str) -> str:
-    """Call Hugging Face Inference API"""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://api-inference.huggingface.co/models/{model_name}",
-            headers={"Authorization": f"Bearer {settings.huggingface_token}"},
-            json={"inputs": text}
-        )
-        result = response.json()
-        return result[0]["generated_text"] if result else "Error processing request"
\ No newline at end of file
+async def call_huggingface_model(hf_client: BatchedHFClient, model_name: str, text: str) -> str:
+    """Call Hugging Face Inference API, reusing results for repeated prompts"""
+    # Surrounding whitespace doesn't change the output, so don't let it split the cache
+    prompt = text.strip()
+    generated = await _generate(hf_client, model_name, prompt)
+    if generated is None:
+        # Don't keep failures around; the next identical request should retry
+        _generate.cache_invalidate(hf_client, model_name, prompt)
+        return "Error processing request"
+    return generated
+
+@alru_cache(maxsize=2048)
+async def _generate(hf_client: BatchedHFClient, model_name: str, text: str) -> Optional[str]:
+    """Send a prompt to a Hugging Face model, returning None if nothing was generated"""
+    return await hf_client.submit(model_name, text)
\ No newline at end of file
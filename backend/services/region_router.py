@@ -1,59 +1,64 @@
 import logging
-from typing import Optional
 from .carbon_service import EIACarbonService
-from config import settings
 
 logger = logging.getLogger(__name__)
 
-async def select_optimal_region() -> str:
+# Oregon - typically has low carbon intensity
+FALLBACK_REGION = "us-west1"
+
+# Rough typical grid values per region, served only when live EIA data is unavailable
+FALLBACK_CARBON = {
+    region: {
+        "carbon_intensity": carbon_intensity,
+        "renewable_percent": renewable_percent,
+        "balancing_authority": balancing_authority,
+        "data_hour": "fallback"
+    }
+    for region, balancing_authority, carbon_intensity, renewable_percent in [
+        ("us-west1", "BPAT", 150.0, 60.0),
+        ("us-west2", "CISO", 220.0, 45.0),
+        ("us-west3", "PACE", 600.0, 15.0),
+        ("us-west4", "NEVP", 400.0, 20.0),
+        ("us-central1", "MISO", 450.0, 25.0),
+        ("us-south1", "ERCO", 380.0, 30.0),
+        ("us-east1", "SCEG", 300.0, 10.0),
+        ("us-east4", "PJM", 370.0, 8.0),
+        ("us-east5", "PJM", 370.0, 8.0),
+    ]
+}
+
+# Moderate estimate for regions without a known balancing authority
+DEFAULT_FALLBACK_CARBON = {
+    "carbon_intensity": 350.0,
+    "renewable_percent": 30.0,
+    "balancing_authority": "unknown",
+    "data_hour": "fallback"
+}
+
+async def select_optimal_region(carbon_service: EIACarbonService) -> str:
     """Select the optimal GCP region based on carbon intensity"""
     try:
-        # Initialize carbon service
-        carbon_service = EIACarbonService(settings.eia_api_key)
-        
         # Get the greenest region
         greenest_region = await carbon_service.get_greenest_region()
-        
-        if greenest_region:
-            logger.info(f"Selected greenest region: {greenest_region}")
-            return greenest_region
-        else:
-            logger.warning("Could not determine greenest region, using fallback")
-            return "us-west1"  # Fallback to Oregon (typically clean)
-            
     except Exception as e:
         logger.error(f"Error selecting optimal region: {e}")
-        # Fallback to a known clean region
-        return "us-west1"  # Oregon - typically has low carbon intensity
+        return FALLBACK_REGION
+        
+    if not greenest_region:
+        logger.warning("Could not determine greenest region, using fallback")
+        return FALLBACK_REGION
+        
+    logger.info(f"Selected greenest region: {greenest_region}")
+    return greenest_region
 
-async def get_region_carbon_data(region: str) -> dict:
+async def get_region_carbon_data(region: str, carbon_service: EIACarbonService) -> dict:
     """Get carbon intensity data for a specific region"""
-    try:
-        carbon_service = EIACarbonService(settings.eia_api_key)
-        carbon_data = await carbon_service.get_region_carbon_intensity(region)
+    # Read only what the refresh loop has cached; a live EIA fetch here would make
+    # every request wait on EIA during an outage
+    carbon_data = carbon_service.get_cached_region_carbon_intensity(region)
         
-        if carbon_data:
-            return {
-                "carbon_intensity": carbon_data["carbon_intensity"],
-                "renewable_percent": carbon_data["renewable_percent"],
-                "balancing_authority": carbon_data["balancing_authority"],
-                "data_hour": carbon_data["data_hour"]
-            }
-        else:
-            # Return estimated values if API fails
-            return {
-                "carbon_intensity": 350.0,  # Moderate estimate
-                "renewable_percent": 30.0,
-                "balancing_authority": "unknown",
-                "data_hour": "estimated"
-            }
-            
-    except Exception as e:
-        logger.error(f"Error getting carbon data for {region}: {e}")
-        # Return fallback values
-        return {
-            "carbon_intensity": 350.0,
-            "renewable_percent": 30.0,
-            "balancing_authority": "unknown", 
-            "data_hour": "error"
-        }
\ No newline at end of file
+    if not carbon_data:
+        # Return estimated values if no live data is available
+        return dict(FALLBACK_CARBON.get(region, DEFAULT_FALLBACK_CARBON))
+        
+    return carbon_data
\ No newline at end of file
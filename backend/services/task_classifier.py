@@ -1,14 +1,33 @@
+import ahocorasick
+
+# Keywords per task type, highest priority first
+TASK_KEYWORDS = [
+    ("grammar", ["grammar", "fix", "correct", "typo"]),
+    ("email", ["email", "draft", "write to"]),
+    ("search", ["?", "search", "find", "what", "how"]),
+]
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """Compile every keyword into one automaton so classification is a single scan"""
+    automaton = ahocorasick.Automaton()
+    for priority, (task_type, keywords) in enumerate(TASK_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, task_type))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
 def classify_task(text: str) -> str:
     """Simple keyword-based task classification"""
-    text_lower = text.lower()
+    best_priority, best_task = len(TASK_KEYWORDS), "grammar"  # default fallback
     
-    if any(word in text_lower for word in ["grammar", "fix", "correct", "typo"]):
-        return "grammar"
-    elif any(word in text_lower for word in ["email", "draft", "write to"]):
-        return "email"
-    elif "?" in text or any(word in text_lower for word in ["search", "find", "what", "how"]):
-        return "search"
-    else:
-        return "grammar"  # default fallback
+    for _, (priority, task_type) in _KEYWORD_AUTOMATON.iter(text.lower()):
+        if priority < best_priority:
+            best_priority, best_task = priority, task_type
+            if priority == 0:
+                break
+    
+    return best_task
     
 #ts is a placeholder lol, i need a gate network to classify the task
\ No newline at end of file